@@ -15,6 +15,8 @@ from .output_def import (
     FittingOutputDef,
     ModelOutputDef,
     OutputVariableDef,
+    disable_check_shapes,
+    enable_check_shapes,
     fitting_check_output,
     get_deriv_name,
     get_hessian_name,
@@ -32,6 +34,8 @@ __all__ = [
     "OutputVariableDef",
     "model_check_output",
     "fitting_check_output",
+    "enable_check_shapes",
+    "disable_check_shapes",
     "get_reduce_name",
     "get_deriv_name",
     "get_hessian_name",
@@ -84,6 +84,10 @@ class DipoleFitting(GeneralFitting):
             Only reducible variable are differentiable.
     type_map: list[str], Optional
             A list of strings. Give the name to each type of atoms.
+    low_prec : bool
+            If true, the contraction of the fitting output with the rotation
+            matrix is computed in bfloat16. Only supported by the PyTorch backend
+            on CUDA devices, and ignored otherwise.
     """
 
     def __init__(
@@ -109,6 +113,7 @@ class DipoleFitting(GeneralFitting):
         c_differentiable: bool = True,
         type_map: Optional[list[str]] = None,
         seed: Optional[Union[int, list[int]]] = None,
+        low_prec: bool = False,
     ) -> None:
         if tot_ener_zero:
             raise NotImplementedError("tot_ener_zero is not implemented")
@@ -122,6 +127,7 @@ class DipoleFitting(GeneralFitting):
         self.embedding_width = embedding_width
         self.r_differentiable = r_differentiable
         self.c_differentiable = c_differentiable
+        self.low_prec = low_prec
         super().__init__(
             var_name="dipole",
             ntypes=ntypes,
@@ -151,15 +157,17 @@ class DipoleFitting(GeneralFitting):
     def serialize(self) -> dict:
         data = super().serialize()
         data["type"] = "dipole"
+        data["@version"] = 3
         data["embedding_width"] = self.embedding_width
         data["r_differentiable"] = self.r_differentiable
         data["c_differentiable"] = self.c_differentiable
+        data["low_prec"] = self.low_prec
         return data
 
     @classmethod
     def deserialize(cls, data: dict) -> "GeneralFitting":
         data = data.copy()
-        check_version_compatibility(data.pop("@version", 1), 2, 1)
+        check_version_compatibility(data.pop("@version", 1), 3, 1)
         var_name = data.pop("var_name", None)
         assert var_name == "dipole"
         return super().deserialize(data)
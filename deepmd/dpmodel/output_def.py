@@ -1,35 +1,91 @@
 # SPDX-License-Identifier: LGPL-3.0-or-later
 import functools
+import os
+from contextlib import (
+    contextmanager,
+)
 from enum import (
     IntEnum,
 )
 
+# output shape checks follow DP_CHECK_SHAPES when it is set, so that
+# DP_CHECK_SHAPES=1 turns them on under python -O; otherwise __debug__
+_CHECK_ENABLED = (
+    os.environ["DP_CHECK_SHAPES"] != "0"
+    if "DP_CHECK_SHAPES" in os.environ
+    else __debug__
+)
+
+
+def enable_check_shapes(enable: bool = True) -> None:
+    """Enable or disable the output checks of `model_check_output`
+    and `fitting_check_output`.
+
+    Classes decorated while the checks are disabled are not wrapped at
+    all, so enabling the checks later does not apply to them.
+
+    Parameters
+    ----------
+    enable : bool
+        If the outputs are checked against their definitions.
+    """
+    global _CHECK_ENABLED
+    _CHECK_ENABLED = enable
+
+
+@contextmanager
+def disable_check_shapes():
+    """Context manager that temporarily disables the output checks."""
+    global _CHECK_ENABLED
+    enabled = _CHECK_ENABLED
+    _CHECK_ENABLED = False
+    try:
+        yield
+    finally:
+        _CHECK_ENABLED = enabled
+
 
 def check_shape(
     shape: list[int],
     def_shape: list[int],
 ) -> None:
     """Check if the shape satisfies the defined shape."""
+    _check_shape(tuple(shape), tuple(def_shape))
+
+
+def _check_shape(
+    shape: tuple[int, ...],
+    def_shape: tuple[int, ...],
+) -> None:
+    """Check if the shape satisfies the defined shape, both given as tuples."""
     assert len(shape) == len(def_shape)
     if def_shape[-1] == -1:
-        if list(shape[:-1]) != def_shape[:-1]:
+        if shape[:-1] != def_shape[:-1]:
             raise ValueError(f"{shape[:-1]} shape not matching def {def_shape[:-1]}")
     else:
-        if list(shape) != def_shape:
+        if shape != def_shape:
             raise ValueError(f"{shape} shape not matching def {def_shape}")
 
 
 def check_var(var, var_def) -> None:
-    if var_def.atomic:
+    _check_var(var, tuple(var_def.shape), var_def.atomic)
+
+
+def _check_var(var, def_shape: tuple[int, ...], atomic: bool) -> None:
+    """Check the variable against the defined shape given as a tuple."""
+    if atomic:
         # var.shape == [nf, nloc, *var_def.shape]
-        if len(var.shape) != len(var_def.shape) + 2:
-            raise ValueError(f"{var.shape[2:]} length not matching def {var_def.shape}")
-        check_shape(list(var.shape[2:]), var_def.shape)
+        if len(var.shape) != len(def_shape) + 2:
+            raise ValueError(f"{var.shape[2:]} length not matching def {def_shape}")
+        # nothing left to compare for scalar variables
+        if def_shape:
+            _check_shape(tuple(var.shape[2:]), def_shape)
     else:
         # var.shape == [nf, *var_def.shape]
-        if len(var.shape) != len(var_def.shape) + 1:
-            raise ValueError(f"{var.shape[1:]} length not matching def {var_def.shape}")
-        check_shape(list(var.shape[1:]), var_def.shape)
+        if len(var.shape) != len(def_shape) + 1:
+            raise ValueError(f"{var.shape[1:]} length not matching def {def_shape}")
+        if def_shape:
+            _check_shape(tuple(var.shape[1:]), def_shape)
 
 
 def model_check_output(cls):
@@ -39,7 +95,12 @@ def model_check_output(cls):
     1. Model.output_def that gives the output definition.
     2. Model.__call__ that defines the forward path of the model.
 
+    If the checks are disabled when decorating, the class is returned
+    unchanged to avoid the overhead of the wrapper.
+
     """
+    if not _CHECK_ENABLED:
+        return cls
 
     @functools.wraps(cls, updated=())
     class wrapper(cls):
@@ -50,25 +111,33 @@ def model_check_output(cls):
         ) -> None:
             super().__init__(*args, **kwargs)
             self.md = self.output_def()
+            # flat (name, shape, atomic) of all the outputs to be checked
+            plan = []
+            for kk in self.md.keys_outp():
+                dd = self.md[kk]
+                names = [kk]
+                if dd.reducible:
+                    names.append(get_reduce_name(kk))
+                dnr, dnc = get_deriv_name(kk)
+                if dd.r_differentiable:
+                    names.append(dnr)
+                if dd.c_differentiable:
+                    assert dd.r_differentiable
+                    names.append(dnc)
+                for nn in names:
+                    plan.append((nn, tuple(self.md[nn].shape), self.md[nn].atomic))
+            self._check_plan = tuple(plan)
 
         def __call__(
             self,
             *args,
             **kwargs,
         ):
+            if not _CHECK_ENABLED:
+                return cls.__call__(self, *args, **kwargs)
             ret = cls.__call__(self, *args, **kwargs)
-            for kk in self.md.keys_outp():
-                dd = self.md[kk]
-                check_var(ret[kk], dd)
-                if dd.reducible:
-                    rk = get_reduce_name(kk)
-                    check_var(ret[rk], self.md[rk])
-                if dd.r_differentiable:
-                    dnr, dnc = get_deriv_name(kk)
-                    check_var(ret[dnr], self.md[dnr])
-                if dd.c_differentiable:
-                    assert dd.r_differentiable
-                    check_var(ret[dnc], self.md[dnc])
+            for kk, shape, atomic in self._check_plan:
+                _check_var(ret[kk], shape, atomic)
             return ret
 
     return wrapper
@@ -81,7 +150,12 @@ def fitting_check_output(cls):
     1. Fitting.output_def that gives the output definition.
     2. Fitting.__call__ defines the forward path of the fitting.
 
+    If the checks are disabled when decorating, the class is returned
+    unchanged to avoid the overhead of the wrapper.
+
     """
+    if not _CHECK_ENABLED:
+        return cls
 
     @functools.wraps(cls, updated=())
     class wrapper(cls):
@@ -92,16 +166,21 @@ def fitting_check_output(cls):
         ) -> None:
             super().__init__(*args, **kwargs)
             self.md = self.output_def()
+            self._check_plan = tuple(
+                (kk, tuple(dd.shape), dd.atomic)
+                for kk, dd in self.md.get_data().items()
+            )
 
         def __call__(
             self,
             *args,
             **kwargs,
         ):
+            if not _CHECK_ENABLED:
+                return cls.__call__(self, *args, **kwargs)
             ret = cls.__call__(self, *args, **kwargs)
-            for kk in self.md.keys():
-                dd = self.md[kk]
-                check_var(ret[kk], dd)
+            for kk, shape, atomic in self._check_plan:
+                _check_var(ret[kk], shape, atomic)
             return ret
 
     return wrapper
@@ -145,6 +224,14 @@ class OutputVariableCategory(IntEnum):
     """Magnetic part of atomic component of the virial."""
 
 
+# any of the operations that make a variable a derivative
+_DERIV_MASK = (
+    OutputVariableOperation.DERV_R.value
+    | OutputVariableOperation._SEC_DERV_R.value
+    | OutputVariableOperation.DERV_C.value
+)
+
+
 class OutputVariableDef:
     """Defines the shape and other properties of the one output variable.
 
@@ -200,11 +287,11 @@ class OutputVariableDef:
     ) -> None:
         self.name = name
         self.shape = list(shape)
-        # jit doesn't support math.prod(self.shape)
+        # this class is compiled by TorchScript in the pt backend,
+        # which doesn't support math.prod(self.shape)
         self.output_size = 1
-        len_shape = len(self.shape)
-        for i in range(len_shape):
-            self.output_size *= self.shape[i]
+        for dim in self.shape:
+            self.output_size *= dim
         self.atomic = atomic
         self.reducible = reducible
         self.r_differentiable = r_differentiable
@@ -219,7 +306,6 @@ class OutputVariableDef:
         self.category = category
         self.r_hessian = r_hessian
         self.magnetic = magnetic
-        self.intensive = intensive
         if self.r_hessian:
             if not self.reducible:
                 raise ValueError("only reducible variable can calculate hessian")
@@ -288,14 +374,14 @@ class ModelOutputDef:
         fit_defs: FittingOutputDef,
     ) -> None:
         self.def_outp = fit_defs
-        self.def_redu = do_reduce(self.def_outp.get_data())
-        self.def_derv_r, self.def_derv_c = do_derivative(self.def_outp.get_data())
+        self.def_redu, self.def_derv_r, self.def_derv_c, self.def_mask = (
+            _build_all_defs(self.def_outp.get_data())
+        )
         self.def_hess_r, _ = do_derivative(self.def_derv_r)
         self.def_derv_c_redu = do_reduce(self.def_derv_c)
-        self.def_mask = do_mask(self.def_outp.get_data())
-        self.var_defs: dict[str, OutputVariableDef] = {}
+        # jit doesn't support dict unpacking, start from a copy of the outputs
+        self.var_defs: dict[str, OutputVariableDef] = self.def_outp.get_data().copy()
         for ii in [
-            self.def_outp.get_data(),
             self.def_redu,
             self.def_derv_c,
             self.def_derv_r,
@@ -338,6 +424,8 @@ class ModelOutputDef:
         return self.def_derv_c_redu.keys()
 
 
+# the name helpers are called from the TorchScript-compiled output defs,
+# so they have to stay plain functions (no functools caching)
 def get_reduce_name(name: str) -> str:
     return name + "_redu"
 
@@ -410,36 +498,105 @@ def check_operation_applied(
 
 def check_deriv(var_def: OutputVariableDef) -> bool:
     """Check if a variable is obtained by derivative."""
-    deriv = (
-        check_operation_applied(var_def, OutputVariableOperation.DERV_R)
-        or check_operation_applied(var_def, OutputVariableOperation._SEC_DERV_R)
-        or check_operation_applied(var_def, OutputVariableOperation.DERV_C)
-    )
-    return deriv
+    # each operation is a single bit, so any of them being applied
+    # is a single mask test
+    return var_def.category & _DERIV_MASK != 0
 
 
-def do_reduce(
-    def_outp_data: dict[str, OutputVariableDef],
-) -> dict[str, OutputVariableDef]:
-    def_redu: dict[str, OutputVariableDef] = {}
-    for kk, vv in def_outp_data.items():
-        if vv.reducible:
-            rk = get_reduce_name(kk)
-            def_redu[rk] = OutputVariableDef(
-                rk,
-                vv.shape,
+def _add_reduce(
+    def_redu: dict[str, OutputVariableDef],
+    kk: str,
+    vv: OutputVariableDef,
+) -> None:
+    if vv.reducible:
+        rk = get_reduce_name(kk)
+        def_redu[rk] = OutputVariableDef(
+            rk,
+            vv.shape,
+            reducible=False,
+            r_differentiable=False,
+            c_differentiable=False,
+            atomic=False,
+            category=apply_operation(vv, OutputVariableOperation.REDU),
+        )
+
+
+def _add_mask(
+    def_mask: dict[str, OutputVariableDef],
+    vv: OutputVariableDef,
+) -> None:
+    if vv.magnetic:
+        # for deep eval when has atomic mask for magnetic atoms
+        def_mask["mask_mag"] = OutputVariableDef(
+            name="mask_mag",
+            shape=[1],
+            reducible=False,
+            r_differentiable=False,
+            c_differentiable=False,
+        )
+
+
+def _add_derivative(
+    def_derv_r: dict[str, OutputVariableDef],
+    def_derv_c: dict[str, OutputVariableDef],
+    kk: str,
+    vv: OutputVariableDef,
+) -> None:
+    rkr, rkc = get_deriv_name(kk)
+    rkrm, rkcm = get_deriv_name_mag(kk)
+    if vv.r_differentiable:
+        # shared by the derivative and its magnetic part
+        shape_r = vv.shape + [3]  # noqa: RUF005
+        category_r = apply_operation(vv, OutputVariableOperation.DERV_R)
+        r_hessian = vv.r_hessian and vv.category == OutputVariableCategory.OUT.value
+        def_derv_r[rkr] = OutputVariableDef(
+            rkr,
+            shape_r,
+            reducible=False,
+            r_differentiable=r_hessian,
+            c_differentiable=False,
+            atomic=True,
+            category=category_r,
+        )
+        if vv.magnetic:
+            def_derv_r[rkrm] = OutputVariableDef(
+                rkrm,
+                shape_r,
                 reducible=False,
+                r_differentiable=r_hessian,
+                c_differentiable=False,
+                atomic=True,
+                category=category_r,
+                magnetic=True,
+            )
+
+    if vv.c_differentiable:
+        assert vv.r_differentiable
+        shape_c = vv.shape + [9]  # noqa: RUF005
+        category_c = apply_operation(vv, OutputVariableOperation.DERV_C)
+        def_derv_c[rkc] = OutputVariableDef(
+            rkc,
+            shape_c,
+            reducible=True,
+            r_differentiable=False,
+            c_differentiable=False,
+            atomic=True,
+            category=category_c,
+        )
+        if vv.magnetic:
+            def_derv_r[rkcm] = OutputVariableDef(
+                rkcm,
+                shape_c,
+                reducible=True,
                 r_differentiable=False,
                 c_differentiable=False,
-                atomic=False,
-                category=apply_operation(vv, OutputVariableOperation.REDU),
+                atomic=True,
+                category=category_c,
+                magnetic=True,
             )
-    return def_redu
 
 
-def do_mask(
-    def_outp_data: dict[str, OutputVariableDef],
-) -> dict[str, OutputVariableDef]:
+def _init_mask() -> dict[str, OutputVariableDef]:
     def_mask: dict[str, OutputVariableDef] = {}
     # for deep eval when has atomic mask
     def_mask["mask"] = OutputVariableDef(
@@ -449,16 +606,24 @@ def do_mask(
         r_differentiable=False,
         c_differentiable=False,
     )
+    return def_mask
+
+
+def do_reduce(
+    def_outp_data: dict[str, OutputVariableDef],
+) -> dict[str, OutputVariableDef]:
+    def_redu: dict[str, OutputVariableDef] = {}
     for kk, vv in def_outp_data.items():
-        if vv.magnetic:
-            # for deep eval when has atomic mask for magnetic atoms
-            def_mask["mask_mag"] = OutputVariableDef(
-                name="mask_mag",
-                shape=[1],
-                reducible=False,
-                r_differentiable=False,
-                c_differentiable=False,
-            )
+        _add_reduce(def_redu, kk, vv)
+    return def_redu
+
+
+def do_mask(
+    def_outp_data: dict[str, OutputVariableDef],
+) -> dict[str, OutputVariableDef]:
+    def_mask = _init_mask()
+    for vv in def_outp_data.values():
+        _add_mask(def_mask, vv)
     return def_mask
 
 
@@ -468,54 +633,28 @@ def do_derivative(
     def_derv_r: dict[str, OutputVariableDef] = {}
     def_derv_c: dict[str, OutputVariableDef] = {}
     for kk, vv in def_outp_data.items():
-        rkr, rkc = get_deriv_name(kk)
-        rkrm, rkcm = get_deriv_name_mag(kk)
-        if vv.r_differentiable:
-            def_derv_r[rkr] = OutputVariableDef(
-                rkr,
-                vv.shape + [3],  # noqa: RUF005
-                reducible=False,
-                r_differentiable=(
-                    vv.r_hessian and vv.category == OutputVariableCategory.OUT.value
-                ),
-                c_differentiable=False,
-                atomic=True,
-                category=apply_operation(vv, OutputVariableOperation.DERV_R),
-            )
-            if vv.magnetic:
-                def_derv_r[rkrm] = OutputVariableDef(
-                    rkrm,
-                    vv.shape + [3],  # noqa: RUF005
-                    reducible=False,
-                    r_differentiable=(
-                        vv.r_hessian and vv.category == OutputVariableCategory.OUT.value
-                    ),
-                    c_differentiable=False,
-                    atomic=True,
-                    category=apply_operation(vv, OutputVariableOperation.DERV_R),
-                    magnetic=True,
-                )
-
-        if vv.c_differentiable:
-            assert vv.r_differentiable
-            def_derv_c[rkc] = OutputVariableDef(
-                rkc,
-                vv.shape + [9],  # noqa: RUF005
-                reducible=True,
-                r_differentiable=False,
-                c_differentiable=False,
-                atomic=True,
-                category=apply_operation(vv, OutputVariableOperation.DERV_C),
-            )
-            if vv.magnetic:
-                def_derv_r[rkcm] = OutputVariableDef(
-                    rkcm,
-                    vv.shape + [9],  # noqa: RUF005
-                    reducible=True,
-                    r_differentiable=False,
-                    c_differentiable=False,
-                    atomic=True,
-                    category=apply_operation(vv, OutputVariableOperation.DERV_C),
-                    magnetic=True,
-                )
+        _add_derivative(def_derv_r, def_derv_c, kk, vv)
     return def_derv_r, def_derv_c
+
+
+def _build_all_defs(
+    def_outp_data: dict[str, OutputVariableDef],
+) -> tuple[
+    dict[str, OutputVariableDef],
+    dict[str, OutputVariableDef],
+    dict[str, OutputVariableDef],
+    dict[str, OutputVariableDef],
+]:
+    """Build the reduced, derivative and mask definitions of the fitting
+    outputs in a single pass, same as `do_reduce`, `do_derivative` and
+    `do_mask` respectively.
+    """
+    def_redu: dict[str, OutputVariableDef] = {}
+    def_derv_r: dict[str, OutputVariableDef] = {}
+    def_derv_c: dict[str, OutputVariableDef] = {}
+    def_mask = _init_mask()
+    for kk, vv in def_outp_data.items():
+        _add_reduce(def_redu, kk, vv)
+        _add_derivative(def_derv_r, def_derv_c, kk, vv)
+        _add_mask(def_mask, vv)
+    return def_redu, def_derv_r, def_derv_c, def_mask
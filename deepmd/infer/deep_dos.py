@@ -126,9 +126,9 @@ class DeepDOS(DeepEval):
             aparam=aparam,
             **kwargs,
         )
-        # energy = results["dos_redu"].reshape(nframes, self.get_numb_dos())
         atomic_energy = results["dos"].reshape(nframes, natoms, self.get_numb_dos())
-        # not same as dos_redu... why?
+        # dos_redu is not used: TensorFlow models frozen before the fix of
+        # o_dos sum over the atoms and frames together when nframes > 1
         energy = np.sum(atomic_energy, axis=1)
 
         if atomic:
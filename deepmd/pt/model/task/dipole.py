@@ -70,6 +70,9 @@ class DipoleFittingNet(GeneralFitting):
         Only reducible variable are differentiable.
     type_map: list[str], Optional
         A list of strings. Give the name to each type of atoms.
+    low_prec : bool
+        If true, the contraction of the fitting output with the rotation
+        matrix is computed in bfloat16 on CUDA devices.
     """
 
     def __init__(
@@ -90,11 +93,13 @@ class DipoleFittingNet(GeneralFitting):
         r_differentiable: bool = True,
         c_differentiable: bool = True,
         type_map: Optional[list[str]] = None,
+        low_prec: bool = False,
         **kwargs,
     ) -> None:
         self.embedding_width = embedding_width
         self.r_differentiable = r_differentiable
         self.c_differentiable = c_differentiable
+        self.low_prec = low_prec
         super().__init__(
             var_name="dipole",
             ntypes=ntypes,
@@ -120,15 +125,17 @@ class DipoleFittingNet(GeneralFitting):
     def serialize(self) -> dict:
         data = super().serialize()
         data["type"] = "dipole"
+        data["@version"] = 3
         data["embedding_width"] = self.embedding_width
         data["r_differentiable"] = self.r_differentiable
         data["c_differentiable"] = self.c_differentiable
+        data["low_prec"] = self.low_prec
         return data
 
     @classmethod
     def deserialize(cls, data: dict) -> "GeneralFitting":
         data = data.copy()
-        check_version_compatibility(data.pop("@version", 1), 2, 1)
+        check_version_compatibility(data.pop("@version", 1), 3, 1)
         data.pop("var_name", None)
         return super().deserialize(data)
 
@@ -181,18 +188,28 @@ class DipoleFittingNet(GeneralFitting):
         nframes, nloc, _ = descriptor.shape
         assert gr is not None, "Must provide the rotation matrix for dipole fitting."
         # cast the input to internal precsion
-        gr = gr.to(self.prec)
+        if gr.dtype != self.prec:
+            gr = gr.to(self.prec)
         # (nframes, nloc, m1)
         out = self._forward_common(descriptor, atype, gr, g2, h2, fparam, aparam)[
             self.var_name
         ]
-        # (nframes * nloc, 1, m1)
-        out = out.view(-1, 1, self.embedding_width)
-        # (nframes * nloc, m1, 3)
-        gr = gr.view(nframes * nloc, self.embedding_width, 3)
+        # (nframes, nloc, 1, m1)
+        out = out.reshape(nframes, nloc, 1, self.embedding_width)
+        # (nframes, nloc, m1, 3)
+        gr = gr.view(nframes, nloc, self.embedding_width, 3)
+        if self.low_prec and out.is_cuda:
+            # bf16 inputs, the tensor cores accumulate in fp32
+            out = torch.matmul(out.to(torch.bfloat16), gr.to(torch.bfloat16)).to(
+                self.prec
+            )
+        else:
+            out = torch.matmul(out, gr)
         # (nframes, nloc, 3)
-        out = torch.bmm(out, gr).squeeze(-2).view(nframes, nloc, 3)
-        return {self.var_name: out.to(env.GLOBAL_PT_FLOAT_PRECISION)}
+        out = out.squeeze(-2)
+        if out.dtype != env.GLOBAL_PT_FLOAT_PRECISION:
+            out = out.to(env.GLOBAL_PT_FLOAT_PRECISION)
+        return {self.var_name: out}
 
     # make jit happy with torch 2.0.0
     exclude_types: list[int]
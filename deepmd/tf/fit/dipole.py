@@ -428,7 +428,8 @@ class DipoleFittingSeA(Fitting):
             The deserialized model
         """
         data = data.copy()
-        check_version_compatibility(data.pop("@version", 1), 2, 1)
+        # version 3 adds low_prec, which is not supported and ignored
+        check_version_compatibility(data.pop("@version", 1), 3, 1)
         fitting = cls(**data)
         fitting.fitting_net_variables = cls.deserialize_network(
             data["nets"],
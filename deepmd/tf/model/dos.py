@@ -186,8 +186,17 @@ class DOSModel(StandardModel):
         dos_raw = atom_dos
 
         dos_raw = tf.reshape(dos_raw, [natoms[0], -1], name="o_atom_dos" + suffix)
-        dos = tf.reduce_sum(
-            global_cvt_2_ener_float(dos_raw), axis=0, name="o_dos" + suffix
+        # sum over the atoms of each frame; summing dos_raw over axis 0
+        # mixes the atoms and frames when there are more than one frame
+        dos = tf.reshape(
+            tf.reduce_sum(
+                tf.reshape(
+                    global_cvt_2_ener_float(atom_dos), [-1, natoms[0], self.numb_dos]
+                ),
+                axis=1,
+            ),
+            [-1],
+            name="o_dos" + suffix,
         )
 
         model_dict = {}
@@ -1673,6 +1673,7 @@ def fitting_dipole():
     doc_precision = f"The precision of the fitting net parameters, supported options are {list_to_doc(PRECISION_DICT.keys())} Default follows the interface precision."
     doc_sel_type = "The atom types for which the atomic dipole will be provided. If not set, all types will be selected."
     doc_seed = "Random seed for parameter initialization of the fitting net"
+    doc_low_prec = "Compute the contraction of the fitting net output with the rotation matrix in bfloat16 on CUDA devices. It speeds up the dipole fitting at the cost of accuracy."
     return [
         Argument(
             "numb_fparam",
@@ -1713,6 +1714,13 @@ def fitting_dipole():
             doc=doc_sel_type + doc_only_tf_supported,
         ),
         Argument("seed", [int, None], optional=True, doc=doc_seed),
+        Argument(
+            "low_prec",
+            bool,
+            optional=True,
+            default=False,
+            doc=doc_only_pt_supported + doc_low_prec,
+        ),
     ]
 
 
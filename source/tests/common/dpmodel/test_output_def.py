@@ -8,6 +8,8 @@ from deepmd.dpmodel import (
     ModelOutputDef,
     NativeOP,
     OutputVariableDef,
+    disable_check_shapes,
+    enable_check_shapes,
     fitting_check_output,
     model_check_output,
 )
@@ -696,6 +698,58 @@ class TestDef(unittest.TestCase):
             ff()
             self.assertIn("not matching", context.exception)
 
+    def test_model_decorator_disable_check(self) -> None:
+        nf = 2
+        nloc = 3
+
+        @model_check_output
+        class Foo(NativeOP):
+            def output_def(self):
+                defs = [
+                    OutputVariableDef(
+                        "energy",
+                        [1],
+                        reducible=True,
+                        r_differentiable=True,
+                        c_differentiable=True,
+                    ),
+                ]
+                return ModelOutputDef(FittingOutputDef(defs))
+
+            def call(self):
+                return {
+                    "energy": np.zeros([nf, nloc, 2]),
+                }
+
+        ff = Foo()
+        with self.assertRaises(ValueError):
+            ff()
+        with disable_check_shapes():
+            ff()
+        with self.assertRaises(ValueError):
+            ff()
+        enable_check_shapes(False)
+        try:
+            ff()
+        finally:
+            enable_check_shapes(True)
+        with self.assertRaises(ValueError):
+            ff()
+
+    def test_decorator_disabled(self) -> None:
+        class Foo(NativeOP):
+            def output_def(self):
+                return FittingOutputDef([])
+
+            def call(self):
+                return {}
+
+        with disable_check_shapes():
+            self.assertIs(model_check_output(Foo), Foo)
+            self.assertIs(fitting_check_output(Foo), Foo)
+        self.assertIsNot(model_check_output(Foo), Foo)
+        self.assertIsNot(fitting_check_output(Foo), Foo)
+
     def test_fitting_decorator(self) -> None:
         nf = 2
         nloc = 3
@@ -801,6 +855,18 @@ class TestDef(unittest.TestCase):
             self.assertIn("shape not matching", context.exception)
         check_var(np.zeros([2, 2, 8]), var_def)
 
+        var_def = VariableDef("foo", [], atomic=True)
+        with self.assertRaises(ValueError) as context:
+            check_var(np.zeros([2, 3, 1]), var_def)
+            self.assertIn("length not matching", context.exception)
+        check_var(np.zeros([2, 3]), var_def)
+
+        var_def = VariableDef("foo", [], atomic=False)
+        with self.assertRaises(ValueError) as context:
+            check_var(np.zeros([2, 3]), var_def)
+            self.assertIn("length not matching", context.exception)
+        check_var(np.zeros([2]), var_def)
+
     def test_squeeze(self) -> None:
         out_var = OutputVariableDef("foo", [])
         out_var.squeeze(0)
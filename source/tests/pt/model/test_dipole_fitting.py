@@ -5,6 +5,9 @@ import unittest
 
 import numpy as np
 import torch
+from dargs import (
+    Argument,
+)
 from scipy.stats import (
     special_ortho_group,
 )
@@ -32,6 +35,9 @@ from deepmd.pt.utils.utils import (
     to_numpy_array,
     to_torch_tensor,
 )
+from deepmd.utils.argcheck import (
+    fitting_dipole,
+)
 
 from ...seed import (
     GLOBAL_SEED,
@@ -144,6 +150,82 @@ class TestDipoleFitting(unittest.TestCase, TestCaseSingleFrameWithNlist):
             ).to(env.DEVICE)
             torch.jit.script(ft0)
 
+    def _low_prec_fittings(self):
+        # go through the input arguments to check low_prec is accepted
+        base = Argument("fitting", dict, sub_fields=fitting_dipole())
+        params = base.normalize_value(
+            {"low_prec": True, "seed": GLOBAL_SEED}, trim_pattern="_*"
+        )
+        base.check_value(params, strict=True)
+        ft0 = DipoleFittingNet(
+            self.nt,
+            self.dd0.dim_out,
+            embedding_width=self.dd0.get_dim_emb(),
+            mixed_types=self.dd0.mixed_types(),
+            **params,
+        ).to(env.DEVICE)
+        ft1 = DPDipoleFitting.deserialize(ft0.serialize())
+        ft2 = DipoleFittingNet.deserialize(ft1.serialize())
+        self.assertTrue(ft0.low_prec)
+        self.assertTrue(ft1.low_prec)
+        self.assertTrue(ft2.low_prec)
+        return ft0, ft1
+
+    def _low_prec_inputs(self):
+        rd0, gr, _, _, _ = self.dd0(
+            torch.tensor(self.coord_ext, dtype=dtype, device=env.DEVICE),
+            torch.tensor(self.atype_ext, dtype=int, device=env.DEVICE),
+            torch.tensor(self.nlist, dtype=int, device=env.DEVICE),
+        )
+        atype = torch.tensor(
+            self.atype_ext[:, : self.nloc], dtype=int, device=env.DEVICE
+        )
+        return rd0, atype, gr
+
+    def _low_prec_eval(self, ft0, ft1):
+        rd0, atype, gr = self._low_prec_inputs()
+        ret0 = ft0(rd0, atype, gr)
+        ret1 = ft1(
+            rd0.detach().cpu().numpy(),
+            atype.detach().cpu().numpy(),
+            gr.detach().cpu().numpy(),
+        )
+        self.assertEqual(ret0["dipole"].dtype, dtype)
+        return to_numpy_array(ret0["dipole"]), ret1["dipole"]
+
+    @unittest.skipIf(
+        env.DEVICE.type == "cuda", "checks the non-bf16 fallback; runs on CPU only"
+    )
+    def test_low_prec_cpu(
+        self,
+    ) -> None:
+        ft0, ft1 = self._low_prec_fittings()
+        ret0, ret1 = self._low_prec_eval(ft0, ft1)
+        np.testing.assert_allclose(ret0, ret1)
+        torch.jit.script(ft0)
+
+    @unittest.skipIf(env.DEVICE.type != "cuda", "bfloat16 path requires CUDA")
+    def test_low_prec_cuda(
+        self,
+    ) -> None:
+        ft0, ft1 = self._low_prec_fittings()
+        ret0, ret1 = self._low_prec_eval(ft0, ft1)
+        # bfloat16 inputs keep about 3 significant digits
+        np.testing.assert_allclose(ret0, ret1, rtol=5e-2, atol=5e-2)
+        # the same contraction done by hand in bfloat16 must match exactly
+        rd0, atype, gr = self._low_prec_inputs()
+        nf, nloc, _ = rd0.shape
+        m1 = ft0.embedding_width
+        gr = gr.to(ft0.prec)
+        out = ft0._forward_common(rd0, atype, gr)[ft0.var_name]
+        ref = torch.matmul(
+            out.reshape(nf, nloc, 1, m1).to(torch.bfloat16),
+            gr.view(nf, nloc, m1, 3).to(torch.bfloat16),
+        )
+        ref = ref.to(ft0.prec).squeeze(-2).to(dtype)
+        np.testing.assert_array_equal(ret0, to_numpy_array(ref))
+        torch.jit.script(ft0)
+
 
 class TestEquivalence(unittest.TestCase):
     def setUp(self) -> None:
@@ -332,3 +332,91 @@ class TestModel(tf.test.TestCase):
         np.testing.assert_almost_equal(pred_dos, ref_dos, places)
         np.testing.assert_almost_equal(np.sum(pred_atom_dos, axis=0), ref_dos, places)
         np.testing.assert_almost_equal(pred_atom_dos[0], ref_ados_1, places)
+
+    def test_model_multi_frame(self) -> None:
+        jfile = "train_dos.json"
+        jdata = j_loader(jfile)
+
+        systems = jdata["training"]["systems"]
+        set_pfx = "set"
+        batch_size = 1
+        test_size = 1
+        rcut = jdata["model"]["descriptor"]["rcut"]
+
+        data = DataSystem(systems, set_pfx, batch_size, test_size, rcut, run_opt=None)
+
+        test_data = data.get_test()
+        nframes = 2
+        numb_dos = 100
+        natoms = test_data["type"].shape[1]
+        # two distinct frames, so mixing atoms across frames changes the sum
+        rng = np.random.default_rng(1)
+        coord = np.concatenate(
+            [
+                test_data["coord"][:1],
+                test_data["coord"][:1] + 0.1 * rng.random([1, natoms * 3]),
+            ]
+        )
+        box = np.tile(test_data["box"][:1], [nframes, 1])
+        atype = np.tile(test_data["type"][:1], [nframes, 1])
+
+        jdata["model"]["fitting_net"]["numb_dos"] = numb_dos
+        jdata["model"]["descriptor"]["neuron"] = [5, 5, 5]
+        jdata["model"]["descriptor"]["axis_neuron"] = 2
+
+        jdata["model"]["descriptor"].pop("type", None)
+        descrpt = DescrptSeA(**jdata["model"]["descriptor"], uniform_seed=True)
+
+        jdata["model"]["fitting_net"].pop("type", None)
+        jdata["model"]["fitting_net"]["ntypes"] = descrpt.get_ntypes()
+        jdata["model"]["fitting_net"]["dim_descrpt"] = descrpt.get_dim_out()
+        fitting = DOSFitting(**jdata["model"]["fitting_net"], uniform_seed=True)
+        model = DOSModel(descrpt, fitting)
+
+        input_data = {
+            "coord": [coord],
+            "box": [box],
+            "type": [atype],
+            "natoms_vec": [test_data["natoms_vec"]],
+            "default_mesh": [test_data["default_mesh"]],
+        }
+        model._compute_input_stat(input_data)
+
+        t_coord = tf.placeholder(GLOBAL_TF_FLOAT_PRECISION, [None], name="i_coord")
+        t_type = tf.placeholder(tf.int32, [None], name="i_type")
+        t_natoms = tf.placeholder(tf.int32, [model.ntypes + 2], name="i_natoms")
+        t_box = tf.placeholder(GLOBAL_TF_FLOAT_PRECISION, [None, 9], name="i_box")
+        t_mesh = tf.placeholder(tf.int32, [None], name="i_mesh")
+        t_fparam = None
+
+        model_pred = model.build(
+            t_coord,
+            t_type,
+            t_natoms,
+            t_box,
+            t_mesh,
+            t_fparam,
+            suffix="se_a_dos_multi_frame",
+            reuse=False,
+        )
+        dos = model_pred["dos"]
+        atom_dos = model_pred["atom_dos"]
+
+        feed_dict_test = {
+            t_coord: np.reshape(coord, [-1]),
+            t_box: box,
+            t_type: np.reshape(atype, [-1]),
+            t_natoms: test_data["natoms_vec"],
+            t_mesh: test_data["default_mesh"],
+        }
+
+        sess = self.cached_session().__enter__()
+        sess.run(tf.global_variables_initializer())
+        [pred_dos, pred_atom_dos] = sess.run([dos, atom_dos], feed_dict=feed_dict_test)
+
+        places = 10
+        np.testing.assert_almost_equal(
+            pred_dos.reshape(nframes, numb_dos),
+            pred_atom_dos.reshape(nframes, natoms, numb_dos).sum(axis=1),
+            places,
+        )